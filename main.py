@@ -18,14 +18,37 @@ Arguments:
         Output folder path to save frames.
 
     -t, --threshold:
-        Threshold for Mean Squared Error (default: -1).
+        Threshold for Mean Squared Error between the binarized frames, from 0 to 1 (default: -1, the mean MSE of each
+        video).
 
     -D, --duration:
         Real duration of the videos in seconds (default: -1).
 
+    -S, --sample-stride:
+        Compare only one frame out of every N frames (default: 1).
+
+    -w, --workers:
+        Number of videos processed in parallel (default: one per CPU).
+
+    -F, --downscale-factor:
+        Factor by which the frames are downscaled before being compared, which is faster but changes which frames are
+        selected (default: 1, no downscaling).
+
+    -g, --segments:
+        Number of ranges of frames of each video compared in parallel (default: 1).
+
+    -T, --decode-threads:
+        Number of threads decoding each video (default: the CPUs shared between the videos decoded at the same time).
+
+    -a, --hw-acceleration:
+        Decode the videos with a hardware decoder when one is available (default: False).
+
     -s, --sort-mode:
         Sorting mode(s) for the images.
 
+    -m, --transfer-mode:
+        Copy, hard link or move the images into the sorted folders (default: copy).
+
     -r, --number-of-frame-per-folder:
         Number of frames per folder (default: 4).
 
@@ -40,8 +63,8 @@ import argparse
 import os
 import shutil
 from utils import (
-    create_folders, create_images_sorted_folders,
-    get_all_images, process_videos_in_folder, sort_images_rec
+    check_sort_modes, create_folders, get_all_images, iter_sorted_images,
+    parse_sort_modes, process_videos_in_folder, transfer_images
 )
 
 
@@ -54,7 +77,14 @@ def main():
     parser.add_argument("-d", "--destination-folder-path", default=None, help="Output folder path to save frames.")
     parser.add_argument("-t", "--threshold", type=float, default=-1., help="Threshold for Mean Squared Error.")
     parser.add_argument("-D", "--duration", type=float, default=-1., help="Real duration of the videos in seconds.")
+    parser.add_argument("-S", "--sample-stride", type=int, default=1, help="Compare only one frame out of every N frames.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of videos processed in parallel.")
+    parser.add_argument("-F", "--downscale-factor", type=int, default=1, help="Factor by which the frames are downscaled before being compared.")
+    parser.add_argument("-g", "--segments", type=int, default=1, help="Number of ranges of frames of each video compared in parallel.")
+    parser.add_argument("-T", "--decode-threads", type=int, default=None, help="Number of threads decoding each video.")
+    parser.add_argument("-a", "--hw-acceleration", default=False, action=argparse.BooleanOptionalAction, help="Decode the videos with a hardware decoder when one is available.")
     parser.add_argument("-s", "--sort-mode", nargs='+', help="Sorting mode for the images.")
+    parser.add_argument("-m", "--transfer-mode", choices=['copy', 'link', 'move'], default='copy', help="Copy, hard link or move the images into the sorted folders.")
     parser.add_argument("-r", "--number-of-frame-per-folder", type=int, default=4, help="Number of frame per folder.")
     parser.add_argument("-n", "--number-of-folder", type=int, default=0, help="Number of subfolders.")
     parser.add_argument("-c", "--clear", default=False, action=argparse.BooleanOptionalAction)
@@ -80,43 +110,33 @@ def main():
     print(destination_folder_path_frames)
     threshold = args.threshold
     duration = args.duration
+    sample_stride = args.sample_stride
+    workers = args.workers
+    downscale = args.downscale_factor
+    segments = args.segments
+    decode_threads = args.decode_threads
+    hw_acceleration = args.hw_acceleration
 
-    process_videos_in_folder(original_folder_path, destination_folder_path_frames, threshold, duration)
+    process_videos_in_folder(original_folder_path, destination_folder_path_frames, threshold, duration, sample_stride,
+                             workers, downscale, segments, decode_threads, hw_acceleration)
 
     original_folder_path = destination_folder_path_frames
     if args.destination_folder_path is not None:
         destination_folder_path_sort = os.path.join(args.destination_folder_path, 'sort_frames')
     else:
         destination_folder_path_sort = os.path.join(os.path.dirname(original_folder_path), 'sort_frames')
-    args_mode = args.sort_mode
-    args_mode.append('')
-    sort_mode = []
-    sort_mode_specs = {}
-    i = 0
-    while i < len(args_mode) - 1:
-        if args_mode[i + 1].isdigit():
-            sort_mode.append(args_mode[i])
-            sort_mode_specs[args_mode[i]] = int(args_mode[i + 1])
-            i += 2
+    sort_mode, sort_mode_specs = parse_sort_modes(args.sort_mode)
+
+    if check_sort_modes(sort_mode):
+        image_list = get_all_images(original_folder_path, sort_mode_specs)
+        if destination_folder_path_sort:
+            sorted_images = iter_sorted_images(image_list, sort_mode, destination_folder_path_sort)
+            transfer_images(sorted_images, args.transfer_mode, total=len(image_list))
+            if clear:
+                shutil.rmtree(original_folder_path)
+            print("Images sorted successfully.")
         else:
-            sort_mode.append(args_mode[i])
-            i += 1
-    if not sort_mode_specs:
-        sort_mode_specs = None
-
-    image_list = get_all_images(original_folder_path, sort_mode_specs)
-
-    if sort_mode is not None:
-        images = sort_images_rec(image_list, sort_mode)
-        if images is not None:
-
-            if destination_folder_path_sort:
-                create_images_sorted_folders(images, destination_folder_path_sort)
-                if clear:
-                    shutil.rmtree(original_folder_path)
-                print("Images sorted successfully.")
-            else:
-                print("Test mode: Images were not moved.")
+            print("Test mode: Images were not moved.")
 
     original_folder_path = destination_folder_path_sort
     if args.destination_folder_path is not None:
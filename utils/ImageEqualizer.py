@@ -2,15 +2,14 @@
 Retrieve Images from Subfolders Script
 
 This script is designed to retrieve images from a folder and its subfolders based on the provided arguments.
-It contains three main functions: `count_images_in_subfolders`, `extract_images_from_subfolders`, and `create_folders`.
+It contains three main functions: `index_images_in_subfolders`, `take_images_from_index`, and `create_folders`.
 
 Functions:
-    count_images_in_subfolders(directory):
-        Count the number of images in each subfolder of the given directory.
+    index_images_in_subfolders(main_folder):
+        List the images of each subfolder of the main folder, in a single scan.
 
-    extract_images_from_subfolders(main_folder, output_folder, num_images):
-        Extract a specified number of images from each subfolder of the main folder
-        and move them to the output folder.
+    take_images_from_index(index, output_folder, num_images):
+        Move a specified number of images of each indexed subfolder to the output folder.
 
     create_folders(main_folder, output_folder, num_images, num_folders):
         Create subfolders and distribute images from the main folder into these subfolders.
@@ -28,91 +27,82 @@ operations, parsing command-line arguments, and displaying progress bars respect
 import os
 import shutil
 import argparse
+from collections import deque
 from tqdm import tqdm
 
 
-def count_images_in_subfolders(directory):
+def index_images_in_subfolders(main_folder):
     """
-    Count the number of images in each subfolder of the given directory.
+    List the images of each subfolder of the main folder, in a single scan.
 
     Parameters:
-        directory (str): The path to the directory to be scanned.
+        main_folder (str): The path to the main folder containing subfolders.
 
     Returns:
-        dict: A dictionary containing the number of images per subfolder.
+        dict: A dictionary mapping each folder containing images (the main folder included) to a deque of the paths of
+              its images, sorted by name.
     """
-    image_counts = {}
-    for root, dirs, files in os.walk(directory):
-        image_files = [f for f in files if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]
-        current_folder = root
-        image_counts[current_folder] = len(image_files)
-    return image_counts
+    index = {}
+    for root, _, files in os.walk(main_folder):
+        images = sorted(f for f in files if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')))
+        if images:
+            index[root] = deque(os.path.join(root, image) for image in images)
+    return index
 
 
-def extract_images_from_subfolders(main_folder, output_folder, num_images):
+def take_images_from_index(index, output_folder, num_images):
     """
-    Extract a specified number of images from each subfolder of the main folder
-    and move them to the output folder.
+    Move a specified number of images of each indexed subfolder to the output folder.
+
+    The moved images are removed from the index, so that the next call takes the following ones.
 
     Parameters:
-        main_folder (str): The path to the main folder containing subfolders.
+        index (dict): The index of the images per subfolder, as returned by index_images_in_subfolders.
         output_folder (str): The path to the output folder.
-        num_images (int): The number of images to extract from each subfolder.
-    """
-    if not os.path.exists(main_folder):
-        print("The main folder does not exist.")
-        return
-
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+        num_images (int): The number of images to move from each subfolder.
 
-    images = []
-    for item in os.listdir(main_folder):
-        item_path = os.path.join(main_folder, item)
-        if os.path.isdir(item_path):
-            extract_images_from_subfolders(item_path, output_folder, num_images)
-        else:
-            if item.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                images.append(item_path)
-                if len(images) == num_images:
-                    for image in images:
-                        shutil.move(image, output_folder)
-                    break
-    if 0 < len(images) < num_images:
-        for image in images:
-            shutil.move(image, output_folder)
+    Returns:
+        int: The number of images moved.
+    """
+    moved = 0
+    for images in index.values():
+        for _ in range(min(num_images, len(images))):
+            shutil.move(images.popleft(), output_folder)
+            moved += 1
+    return moved
 
 
 def create_folders(main_folder, output_folder, num_images, num_folders):
     """
     Create subfolders and distribute images from the main folder into these subfolders.
 
+    The main folder is scanned only once, the images of each subfolder are then taken from this index.
+
     Parameters:
         main_folder (str): The path to the main folder containing images.
         output_folder (str): The path to the output folder for the subfolders.
         num_images (int): The number of images to place in each subfolder.
         num_folders (int): The number of subfolders to create.
     """
+    if not os.path.exists(main_folder):
+        print("The main folder does not exist.")
+        return
+
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    images_per_subfolder = count_images_in_subfolders(main_folder)
-    nombre_elements_sup_0 = 0
-
-    for value in images_per_subfolder.values():
-        if value > 0:
-            nombre_elements_sup_0 += 1
-    max_num_images = nombre_elements_sup_0 * num_images
+    index = index_images_in_subfolders(main_folder)
+    max_num_images = len(index) * num_images
 
     if num_folders <= 0:
-        num_folders = int(max(images_per_subfolder.values()) / num_images)
+        num_folders = int(max((len(images) for images in index.values()), default=0) / num_images)
 
     for i in tqdm(range(num_folders), desc="Creating subfolders", unit="folder"):
         new_output_path = os.path.join(output_folder, os.path.basename(output_folder) + f'_{i + 1}')
         if not os.path.exists(new_output_path):
             os.makedirs(new_output_path)
-        extract_images_from_subfolders(main_folder, new_output_path, num_images)
-        if count_images_in_subfolders(new_output_path)[new_output_path] == max_num_images:
+        moved = take_images_from_index(index, new_output_path, num_images)
+        if moved == max_num_images:
             shutil.move(new_output_path, new_output_path + '_full')
 
 
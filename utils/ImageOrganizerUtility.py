@@ -2,30 +2,52 @@
 Image Sorting Script
 
 This script is designed to sort images in a given folder and its subfolders based on specified criteria.
-It includes functions for checking if a file is an image, checking if a file matches given targets,
-retrieving a list of all image files in a directory, and sorting the images by specific criteria.
+It includes functions for retrieving a list of all image files in a directory, keeping the images matching given
+targets, and sorting the images by specific criteria.
 
 Functions:
-    is_image(file_path):
-        Check if a file is an image based on its extension.
+    parse_image_name(file_path):
+        Split the name of an image into its box, camera, date and time fields.
 
-    is_targeted(file_path, targets):
-        Check if the file matches the given targets.
+    filter_targeted_images(images, targets):
+        Keep the images whose name matches all the given targets.
+
+    iter_image_folders(directory):
+        Iterate over a directory and its subdirectories, listing the image files of each of them.
 
     get_all_images(directory, targets=None):
         Retrieve a list of all image files (png, jpg, jpeg, gif, bmp, tiff) in a given directory and its subdirectories.
 
-    sort_images_by_key(images, key_func):
-        Sort a list of image files into groups based on a given key function.
+    parse_sort_modes(arguments):
+        Split the sort-mode command-line arguments into sorting modes and target values.
+
+    check_sort_modes(modes):
+        Check that all the given sorting modes are valid.
+
+    make_sort_key(modes):
+        Build a function giving the groups of an image for several sorting modes at once.
 
     sort_images_rec(images, modes):
-        Recursively sort a list of image files based on multiple sorting modes.
+        Sort a list of image files into nested groups based on multiple sorting modes.
+
+    iter_sorted_images(images, modes, root):
+        Sort a list of image files based on multiple sorting modes, yielding the sorted folder of each image.
+
+    transfer_image(image, folder, mode='copy'):
+        Copy, hard link or move an image into a folder.
+
+    flatten_sorted_images(images_sorted, prev_path=''):
+        List the images of a sorted image dictionary with the folder each one belongs to.
+
+    transfer_images(pairs, mode='copy', workers=None, total=None):
+        Create the sorted folders and copy images into them as the (image, folder) pairs are produced.
 
-    create_images_sorted_folders(images_sorted, prev_path=''):
+    create_images_sorted_folders(images_sorted, prev_path='', mode='copy', workers=None):
         Create sorted folders and copy images into them based on the provided sorted image dictionary.
 
 The script uses the argparse module to parse command-line arguments, allowing users to specify the path of the
-original folder containing the images, the destination folder for the sorted images, and the sorting mode(s).
+original folder containing the images, the destination folder for the sorted images, the sorting mode(s), and whether
+the images are copied, hard linked or moved into the sorted folders.
 
 The main() function is responsible for parsing the arguments and calling the necessary functions to sort the images.
 If the required argument (-o) for the original folder path is not provided, or the required sorting mode (-s) is not
@@ -40,65 +62,110 @@ and "box 1" will sort images that have "box_1" in their filenames.
 """
 
 import os
+import errno
 import shutil
 import argparse
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 from tqdm import tqdm
 
+# Extensions (lowercase, without the dot) of the files considered as images
+IMAGE_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'})
 
-def is_image(file_path):
+# Fields of an image name, in the order returned by parse_image_name
+NAME_FIELDS = ('box', 'cam', 'year', 'month', 'day', 'hour', 'minute', 'second')
+
+# Dictionary mapping sorting modes to the function giving the group of an image from the fields of its name
+SORTING_FUNCTIONS = {
+    'box': lambda fields: 'box_' + fields[0],
+    'cam': lambda fields: 'cam_' + fields[1],
+    'year': lambda fields: 'year_' + fields[2],
+    'month': lambda fields: 'month_' + fields[3],
+    'day': lambda fields: 'day_' + fields[4],
+    'hour': lambda fields: 'hour_' + fields[5],
+    'minute': lambda fields: 'minute_' + fields[6],
+    'second': lambda fields: 'second_' + fields[7],
+}
+
+
+def parse_image_name(file_path):
     """
-    Check if a file is an image based on its extension.
+    Split the name of an image into its box, camera, date and time fields.
 
     Parameters:
-        file_path (str): The path of the file to check.
+        file_path (str): The path of the image, named `{id_box}_{id_cam}_{YYYY}-{MM}-{DD}_{hh}-{mm}-{ss}`.
 
     Returns:
-        bool: True if the file is an image, False otherwise.
+        tuple: The fields of the name as strings, in the order of NAME_FIELDS.
     """
-    image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff']
-    _, file_extension = os.path.splitext(file_path)
-    return file_extension.lower() in image_extensions
+    parts = os.path.basename(file_path).split('_')
+    date = parts[2].split('-')
+    time = parts[3].split('-')
+    return parts[0], parts[1], date[0], date[1], date[2], time[0], time[1], time[2].split('.')[0]
 
 
-def is_targeted(file_path, targets):
+def filter_targeted_images(images, targets):
     """
-    Check if the file matches the given targets.
+    Keep the images whose name matches all the given targets.
+
+    Each name is parsed once, then the images are filtered target by target. Only the field of each target is
+    converted to an integer, and only for the images matching the previous targets, so the other fields of the names
+    do not need to be numbers.
 
     Parameters:
-        file_path (str): The path of the file to check.
-        targets (dict): A dictionary containing specific criteria to match against the file.
+        images (list): A list of file paths of image files to filter.
+        targets (dict): A dictionary containing specific criteria to match against the files.
 
     Returns:
-        bool: True if the file matches all the specified targets, False otherwise.
+        list: The file paths of the images matching all the specified targets, in their original order.
+
+    Raises:
+        ValueError: If a target is not a field of the image names (see NAME_FIELDS).
     """
-    # Iterate through the target keys and their corresponding values
+    selected = [(image, parse_image_name(image)) for image in images]
+
     for key, value in targets.items():
-        # Extract the relevant part of the file name based on the key (e.g., 'box', 'cam', etc.)
-        if key == 'box':
-            target_value = int(os.path.basename(file_path).split('_')[0])
-        elif key == 'cam':
-            target_value = int(os.path.basename(file_path).split('_')[1])
-        elif key == 'year':
-            target_value = int(os.path.basename(file_path).split('_')[2].split('-')[0])
-        elif key == 'month':
-            target_value = int(os.path.basename(file_path).split('_')[2].split('-')[1])
-        elif key == 'day':
-            target_value = int(os.path.basename(file_path).split('_')[2].split('-')[2])
-        elif key == 'hour':
-            target_value = int(os.path.basename(file_path).split('_')[3].split('-')[0])
-        elif key == 'minute':
-            target_value = int(os.path.basename(file_path).split('_')[3].split('-')[1])
-        elif key == 'second':
-            target_value = int(os.path.basename(file_path).split('_')[3].split('-')[2].split('.')[0])
-
-        # Check if the extracted target value matches the provided target value
-        if value != target_value:
-            return False
+        if key not in NAME_FIELDS:
+            raise ValueError(f"The target '{key}' is not a field of the image names.")
+        field_index = NAME_FIELDS.index(key)
+        selected = [(image, fields) for image, fields in selected if int(fields[field_index]) == value]
+
+    return [image for image, _ in selected]
+
+
+def iter_image_folders(directory):
+    """
+    Iterate over a directory and its subdirectories, listing the image files of each of them.
+
+    The directories are scanned with os.scandir, whose entries already carry their path and type, so no extra stat
+    or path join is needed per file. Symbolic links to directories are not followed. As with os.walk, directories
+    that cannot be listed (missing or unreadable) are skipped.
+
+    Parameters:
+        directory (str): The path of the root directory to search for images.
+
+    Yields:
+        list: The paths of the image files found in each scanned directory.
+    """
+    directories = [directory]
+    while directories:
+        images = []
+        try:
+            entries = os.scandir(directories.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file():
+                    _, dot, extension = entry.name.rpartition('.')
+                    if dot and extension.lower() in IMAGE_EXTENSIONS:
+                        images.append(entry.path)
+        yield images
 
-    # If all target checks pass, return True indicating the file matches all specified targets
-    return True
-    
 
 def get_all_images(directory, targets=None):
     """
@@ -106,48 +173,83 @@ def get_all_images(directory, targets=None):
 
     Parameters:
         directory (str): The absolute path of the root directory to search for images.
+        targets (dict): Optional criteria the image names must match (see filter_targeted_images).
 
     Returns:
         list: A list of absolute file paths of all image files found in the directory and its subdirectories.
     """
-    image_files = []
-    for root, _, files in tqdm(os.walk(directory), desc="Searching for images", unit=" files"):
-        if targets is None:
-            for file in files:
-                file_path = os.path.join(root, file)
-                if is_image(file_path):
-                    image_files.append(file_path)
-        else:
-            for file in files:
-                file_path = os.path.join(root, file)
-                if is_image(file_path):
-                    if is_targeted(file_path, targets):
-                        image_files.append(file_path)
+    # The progress bar is updated once per folder, not once per file
+    folders = tqdm(iter_image_folders(directory), desc="Searching for images", unit=" folders")
+    image_files = [image for images in folders for image in images]
+
+    if targets is not None:
+        image_files = filter_targeted_images(image_files, targets)
     return image_files
 
 
-def sort_images_by_key(images, key_func):
+def parse_sort_modes(arguments):
     """
-    Sort a list of image files into groups based on a given key function.
+    Split the sort-mode command-line arguments into sorting modes and target values.
 
     Parameters:
-        images (list): A list of absolute file paths of image files to be sorted.
-        key_func (function): A function that takes an image file path as input and returns the grouping key.
+        arguments (list): The sort-mode arguments, where each mode can be followed by an integer target value
+                          (e.g. ['year', '2023', 'month']).
+
+    Returns:
+        tuple: The list of sorting modes, and a dictionary of the target value of each mode followed by one
+               (None if there is no target value).
+    """
+    sort_mode = []
+    sort_mode_specs = {}
+    i = 0
+    while i < len(arguments):
+        sort_mode.append(arguments[i])
+        if i + 1 < len(arguments) and arguments[i + 1].isdigit():
+            sort_mode_specs[arguments[i]] = int(arguments[i + 1])
+            i += 2
+        else:
+            i += 1
+    return sort_mode, sort_mode_specs or None
+
+
+def check_sort_modes(modes):
+    """
+    Check that all the given sorting modes are valid.
+
+    Parameters:
+        modes (list): A list of sorting modes.
+
+    Returns:
+        bool: True if all the sorting modes are valid, False otherwise (the first invalid mode is reported).
+    """
+    for mode in modes:
+        if mode not in SORTING_FUNCTIONS:
+            print(f"The sorting mode '{mode}' is not valid.")
+            return False
+    return True
+
+
+def make_sort_key(modes):
+    """
+    Build a function giving the groups of an image for several sorting modes at once.
+
+    Parameters:
+        modes (list): A list of valid sorting modes, in order.
 
     Returns:
-        dict: A dictionary where keys are the grouping keys returned by the key_func,
-              and values are lists of image file paths belonging to each group.
+        function: A function that takes the fields of an image name (see parse_image_name) and returns the tuple of
+                  the groups of the image, one per sorting mode.
     """
-    output = defaultdict(list)
-    for image in images:
-        idx = key_func(image)
-        output[idx].append(image)
-    return output
+    functions = [SORTING_FUNCTIONS[mode] for mode in modes]
+    return lambda fields: tuple(function(fields) for function in functions)
 
 
 def sort_images_rec(images, modes):
     """
-    Recursively sort a list of image files based on multiple sorting modes.
+    Sort a list of image files into nested groups based on multiple sorting modes.
+
+    The images are sorted once on the tuple of their groups for all the modes, then each level of the nested groups
+    is built by grouping consecutive images, instead of bucketing the images again at every level.
 
     Parameters:
         images (list): A list of absolute file paths of image files to be sorted.
@@ -161,58 +263,173 @@ def sort_images_rec(images, modes):
     if not modes:
         return images
 
-    # Dictionary mapping sorting modes to their corresponding functions
-    sorting_functions = {
-        'box': lambda image: 'box_' + os.path.basename(image).split('_')[0],
-        'cam': lambda image: 'cam_' + os.path.basename(image).split('_')[1],
-        'year': lambda image: 'year_' + os.path.basename(image).split('_')[2].split('-')[0],
-        'month': lambda image: 'month_' + os.path.basename(image).split('_')[2].split('-')[1],
-        'day': lambda image: 'day_' + os.path.basename(image).split('_')[2].split('-')[2],
-        'hour': lambda image: 'hour_' + os.path.basename(image).split('_')[3].split('-')[0],
-        'minute': lambda image: 'minute_' + os.path.basename(image).split('_')[3].split('-')[1],
-        'second': lambda image: 'second_' + os.path.basename(image).split('_')[3].split('-')[2].split('.')[0],
-    }
-
-    # Get the sorting function for the current mode
-    sorting_function = sorting_functions.get(modes[0])
-    if sorting_function is None:
-        print(f"The sorting mode '{modes[0]}' is not valid.")
+    if not check_sort_modes(modes):
         return None
 
-    # Sort images based on the current mode
-    sorted_images = sort_images_by_key(images, sorting_function)
+    sort_key = make_sort_key(modes)
+    keyed_images = sorted(((sort_key(parse_image_name(image)), image) for image in images), key=itemgetter(0))
+
+    def group(keyed_group, level):
+        groups = {}
+        for key, items in groupby(keyed_group, key=lambda item: item[0][level]):
+            if level + 1 < len(modes):
+                groups[key] = group(items, level + 1)
+            else:
+                groups[key] = [image for _, image in items]
+        return groups
+
+    return group(keyed_images, 0)
+
+
+def iter_sorted_images(images, modes, root):
+    """
+    Sort a list of image files based on multiple sorting modes, yielding the sorted folder of each image.
+
+    Unlike sort_images_rec, no nested dictionary of the groups is built: the images are sorted once on the tuple of
+    their groups, and each image is yielded with the folder of its group, the images of a group being consecutive.
+
+    Parameters:
+        images (list): A list of absolute file paths of image files to be sorted.
+        modes (list): A list of valid sorting modes to be applied in order (see check_sort_modes).
+        root (str): The path of the folder in which the sorted folders are created.
+
+    Yields:
+        tuple: An image file path and the path of its sorted folder.
+    """
+    sort_key = make_sort_key(modes)
+    keyed_images = sorted(((sort_key(parse_image_name(image)), image) for image in images), key=itemgetter(0))
+
+    for key, items in groupby(keyed_images, key=itemgetter(0)):
+        path = os.path.join(root, *key)
+        for _, image in items:
+            yield image, path
+
+
+def transfer_image(image, folder, mode='copy'):
+    """
+    Copy, hard link or move an image into a folder.
+
+    An existing file of the same name in the folder is replaced, unless it already is the image itself (e.g. a hard
+    link made by a previous run). It is removed before copying or linking rather than written into, since it may be a
+    hard link to another image.
+
+    Parameters:
+        image (str): The path of the image.
+        folder (str): The path of the destination folder.
+        mode (str): 'copy' to copy the image with its metadata, 'link' to create a hard link to it without copying
+            any data, or 'move' to move it.
+
+    Returns:
+        None
+    """
+    destination = os.path.join(folder, os.path.basename(image))
+    if mode == 'move':
+        shutil.move(image, destination)
+        return
+
+    if os.path.lexists(destination):
+        if os.path.exists(destination) and os.path.samefile(image, destination):
+            return
+        os.unlink(destination)
+
+    if mode == 'link':
+        try:
+            os.link(image, destination)
+            return
+        except OSError as error:
+            # Hard links are not possible across file systems (or on some of them), copy the image instead
+            if error.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+    shutil.copy2(image, destination)
+
+
+def flatten_sorted_images(images_sorted, prev_path=''):
+    """
+    List the images of a sorted image dictionary with the folder each one belongs to.
+
+    Parameters:
+        images_sorted (dict): A dictionary representing the sorted groups of image file paths.
+        prev_path (str): The path of the parent directory for the current level of sorting.
 
-    if len(modes) > 1:
-        # If there are more sorting modes, apply recursion to sort the groups at deeper levels
-        for key, value in sorted_images.items():
-            sorted_images[key] = sort_images_rec(value, modes[1:])
+    Returns:
+        list: A list of (image, folder) tuples, where folder is the path of the sorted folder of the image.
+    """
+    pairs = []
+    for key, value in images_sorted.items():
+        path = os.path.join(prev_path, key)
+        if isinstance(value, list):
+            pairs.extend((image, path) for image in value)
+        else:
+            pairs.extend(flatten_sorted_images(value, path))
+    return pairs
+
+
+def transfer_images(pairs, mode='copy', workers=None, total=None):
+    """
+    Create the sorted folders and copy images into them as the (image, folder) pairs are produced.
 
-    return sorted_images
+    The transfers are I/O bound, so they are spread over a pool of threads. Each folder is created before the first
+    transfer into it is dispatched, so that the threads never race on them, and only a bounded number of transfers
+    are waiting at any time, so the pairs can be streamed without being all held in memory. Images with the same
+    name in the same folder are transferred one after the other, in order, so the last one wins.
 
+    Parameters:
+        pairs (iterable): The (image, folder) tuples of the images to transfer.
+        mode (str): How the images are put in the folders, 'copy', 'link' or 'move' (see transfer_image).
+        workers (int): Number of images transferred at the same time (None uses four threads per CPU, up to 32).
+        total (int): The number of pairs, only used to display the progress.
 
-def create_images_sorted_folders(images_sorted, prev_path=''):
+    Returns:
+        None
+    """
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+
+    created_folders = set()
+    # Last transfer dispatched to each destination file, only while it is pending
+    transfers = {}
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor, \
+            tqdm(total=total, desc="Copying and sorting images", unit=" images") as pbar:
+
+        def complete_oldest():
+            destination, future = pending.popleft()
+            future.result()
+            if transfers.get(destination) is future:
+                del transfers[destination]
+            pbar.update(1)
+
+        for image, path in pairs:
+            if path not in created_folders:
+                os.makedirs(path, exist_ok=True)
+                created_folders.add(path)
+            destination = os.path.join(path, os.path.basename(image))
+            if destination in transfers:
+                transfers[destination].result()
+            future = executor.submit(transfer_image, image, path, mode)
+            transfers[destination] = future
+            pending.append((destination, future))
+            if len(pending) >= 4 * workers:
+                complete_oldest()
+        while pending:
+            complete_oldest()
+
+
+def create_images_sorted_folders(images_sorted, prev_path='', mode='copy', workers=None):
     """
     Create sorted folders and copy images into them based on the provided sorted image dictionary.
 
     Parameters:
         images_sorted (dict): A dictionary representing the sorted groups of image file paths.
         prev_path (str): The path of the parent directory for the current level of sorting.
+        mode (str): How the images are put in the folders, 'copy', 'link' or 'move' (see transfer_image).
+        workers (int): Number of images transferred at the same time (None uses four threads per CPU, up to 32).
 
     Returns:
         None
     """
-    total_images = sum(len(value) if isinstance(value, list) else 1 for value in images_sorted.values())
-
-    with tqdm(total=total_images, desc="Copying and sorting images", unit=" images") as pbar:
-        for key, value in images_sorted.items():
-            path = os.path.join(prev_path, key)
-            os.makedirs(path, exist_ok=True)
-            if isinstance(value, list):
-                for image in value:
-                    shutil.copy2(image, path)
-                    pbar.update(1)
-            else:
-                create_images_sorted_folders(value, path)
+    pairs = flatten_sorted_images(images_sorted, prev_path)
+    transfer_images(pairs, mode, workers, len(pairs))
 
 
 def main():
@@ -220,6 +437,7 @@ def main():
     parser.add_argument("-o", "--original-folder-path", help="Absolute path of the folder containing the images.")
     parser.add_argument("-d", "--destination-folder-path", default='', help="Absolute path of the folder for the sorted images.")
     parser.add_argument("-s", "--sort-mode", nargs='+', help="Sorting mode for the images.")
+    parser.add_argument("-m", "--transfer-mode", choices=['copy', 'link', 'move'], default='copy', help="Copy, hard link or move the images into the sorted folders.")
     args = parser.parse_args()
 
     # Check if the original-folder-path option is empty
@@ -237,33 +455,16 @@ def main():
         destination_folder_path = os.path.join(args.destination_folder_path, 'sort_frames')
     else:
         destination_folder_path = os.path.join(os.path.dirname(original_folder_path), 'sort_frames')
-    args_mode = args.sort_mode
-    args_mode.append('')
-    sort_mode = []
-    sort_mode_specs = {}
-    i = 0
-    while i < len(args_mode)-1:
-        if args_mode[i+1].isdigit():
-            sort_mode.append(args_mode[i])
-            sort_mode_specs[args_mode[i]] = int(args_mode[i+1])
-            i += 2
+    sort_mode, sort_mode_specs = parse_sort_modes(args.sort_mode)
+
+    if check_sort_modes(sort_mode):
+        image_list = get_all_images(original_folder_path, sort_mode_specs)
+        if destination_folder_path:
+            sorted_images = iter_sorted_images(image_list, sort_mode, destination_folder_path)
+            transfer_images(sorted_images, args.transfer_mode, total=len(image_list))
+            print("Images sorted successfully.")
         else:
-            sort_mode.append(args_mode[i])
-            i += 1
-    if not sort_mode_specs:
-        sort_mode_specs = None
-
-    image_list = get_all_images(original_folder_path, sort_mode_specs)
-
-    if sort_mode is not None:
-        images = sort_images_rec(image_list, sort_mode)
-        if images is not None:
-
-            if destination_folder_path:
-                create_images_sorted_folders(images, destination_folder_path)
-                print("Images sorted successfully.")
-            else:
-                print("Test mode: Images were not moved.")
+            print("Test mode: Images were not moved.")
 
 
 if __name__ == "__main__":
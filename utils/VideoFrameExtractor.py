@@ -9,14 +9,32 @@ Functions:
     calculate_mse(frame1, frame2):
         Calculate the Mean Squared Error (MSE) between two images.
 
-    preprocess_image(frame):
-        Preprocess an image by converting to grayscale, cropping, and binarizing.
+    crop_frame(frame):
+        Crop a frame to the region used to compare frames.
 
-    process_video(video_path, output_folder, threshold=-1, duration=-1):
+    preprocess_image(frame, out_gray=None, downscale=1, out_bin=None):
+        Preprocess an image by cropping, converting to grayscale, downscaling, and binarizing.
+
+    open_video(video_path, decode_threads=0, hw_acceleration=False):
+        Open a video, decoded by the given number of threads or by the hardware.
+
+    read_frames(cap, sample_stride=1, prefetch=16, frame_indices=None, start=0, end=None):
+        Decode the frames of an opened video on a background thread.
+
+    write_images(workers=4, queue_size=8):
+        Encode images to JPEG and write them to files on background threads.
+
+    compare_frames(video_path, start=0, end=None, sample_stride=1, downscale=1, threshold=-1, save_frame=None,
+                   decode_threads=0, hw_acceleration=False):
+        Calculate the MSE between the frames of a range of a video and save frames that exceed the threshold.
+
+    process_video(video_path, output_folder, threshold=-1, duration=-1, sample_stride=1, downscale=1, segments=1,
+                  decode_threads=0, hw_acceleration=False):
         Process a video by calculating the MSE between frames and saving frames that exceed the threshold.
 
-    process_videos_in_folder(folder_path, output_folder, threshold, duration):
-        Process all videos in a folder using the 'process_video' function.
+    process_videos_in_folder(folder_path, output_folder, threshold, duration, sample_stride=1, workers=None,
+                             downscale=1, segments=1, decode_threads=None, hw_acceleration=False):
+        Process all videos in a folder in parallel using the 'process_video' function.
 
 The script uses the argparse module to parse command-line arguments, allowing users to specify the path of the folder
 containing the videos, the output folder path to save frames, the threshold for the Mean Squared Error, and the real
@@ -31,16 +49,29 @@ frames, and the frames are saved as JPEG images with filenames indicating the or
 
 import os
 import cv2
+import queue
+import re
+import threading
 import numpy as np
 import argparse
 from tqdm import tqdm
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+# Extensions (lowercase, without the dot) of the files considered as videos
+VIDEO_EXTENSIONS = frozenset({'mp4', 'avi'})
+
 
 def calculate_mse(frame1, frame2):
     """
     Calculate the Mean Squared Error (MSE) between two images.
 
+    The sum of squared differences is computed by OpenCV in a single pass, without intermediate arrays and without
+    the differences wrapping around as they do with uint8 arithmetic. It is divided by 255 ** 2, so that for
+    binarized images the MSE is the fraction of differing pixels, from 0 to 1, the scale of the thresholds.
+
     Parameters:
         frame1 (numpy.ndarray): First image (in grayscale).
         frame2 (numpy.ndarray): Second image (in grayscale).
@@ -48,111 +79,419 @@ def calculate_mse(frame1, frame2):
     Returns:
         float: The Mean Squared Error between the two images.
     """
-    squared_diff = (frame1 - frame2) ** 2
-    mse = np.mean(squared_diff)
+    mse = cv2.norm(frame1, frame2, cv2.NORM_L2SQR) / (255 ** 2 * frame1.size)
     return mse
 
 
-def preprocess_image(frame):
+def crop_frame(frame):
     """
-    Preprocess an image by converting to grayscale, cropping, and binarizing.
+    Crop a frame to the region used to compare frames.
+
+    Only the vertical band in the middle half of the width is compared: the left and right quarters are removed and
+    the full height is kept.
+
+    Parameters:
+        frame (numpy.ndarray): Input image.
+
+    Returns:
+        numpy.ndarray: A view on the cropped region of the image (no pixel is copied).
+    """
+    width = frame.shape[1]
+    crop_width = int(width * 0.25)
+    return frame[:, crop_width:width - crop_width]
+
+
+def preprocess_image(frame, out_gray=None, downscale=1, out_bin=None):
+    """
+    Preprocess an image by cropping, converting to grayscale, downscaling, and binarizing.
+
+    The frame is cropped before the color conversion, so that only the pixels of the cropped region are converted.
+    Comparing frames does not need fine details, so the grayscale image can be downscaled (by averaging blocks of
+    pixels) before the median and the binarization, which then work on `downscale ** 2` times fewer pixels.
+
+    The median is read from the 256-bin histogram of the grayscale image instead of sorting its pixels. It is the
+    lower of the two middle values when the number of pixels is even, which binarizes the image exactly as their mean.
 
     Parameters:
         frame (numpy.ndarray): Input image (in color).
+        out_gray (numpy.ndarray): Optional buffer reused for the grayscale conversion instead of allocating a new
+            image, it must have the size of the cropped region and the uint8 type.
+        downscale (int): Factor by which the width and the height are divided (1 keeps the full resolution).
+        out_bin (numpy.ndarray): Optional buffer in which the image is downscaled and binarized instead of allocating
+            new images, it must have the size of the downscaled region and the uint8 type.
 
     Returns:
-        numpy.ndarray: The preprocessed image (in grayscale and binarized).
+        numpy.ndarray: The preprocessed image (in grayscale and binarized), `out_bin` if it was given.
     """
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    frame_cropped = crop_frame(frame)
+    gray_frame = cv2.cvtColor(frame_cropped, cv2.COLOR_BGR2GRAY, dst=out_gray)
 
-    height, width = gray_frame.shape[:2]
-    crop_width = int(width * 0.25)
-    crop_height = int(height * 0)
-    frame_cropped = gray_frame[crop_height:height - crop_height, crop_width:width - crop_width]
+    if downscale > 1:
+        height, width = gray_frame.shape[:2]
+        size = (max(1, width // downscale), max(1, height // downscale))
+        gray_frame = cv2.resize(gray_frame, size, dst=out_bin, interpolation=cv2.INTER_AREA)
 
-    median_value = np.median(frame_cropped)
+    hist = cv2.calcHist([gray_frame], [0], None, [256], [0, 256]).ravel()
+    cumulative_hist = np.cumsum(hist, dtype=np.float64)
+    median_value = np.searchsorted(cumulative_hist, cumulative_hist[-1] / 2)
 
-    _, binary_frame = cv2.threshold(frame_cropped, median_value, 255, cv2.THRESH_BINARY)
+    _, binary_frame = cv2.threshold(gray_frame, median_value, 255, cv2.THRESH_BINARY, dst=out_bin)
 
     return binary_frame
 
 
-def process_video(video_path, output_folder, threshold=-1, duration=-1):
+def open_video(video_path, decode_threads=0, hw_acceleration=False):
+    """
+    Open a video, decoded by the given number of threads or by the hardware.
+
+    By default the FFmpeg backend decodes each video with one thread per CPU, which oversubscribes the CPUs when
+    several videos (or several ranges of a video) are decoded at the same time.
+
+    With hardware acceleration, the video is decoded by any hardware decoder available to the backend (NVDEC, VA-API,
+    Quick Sync...), and by the CPU if there is none or if it does not support the codec. The decoded frames are still
+    returned in main memory.
+
+    Parameters:
+        video_path (str): Path of the video.
+        decode_threads (int): Number of threads decoding the video (0 keeps the default of the backend).
+        hw_acceleration (bool): Whether to decode the video with a hardware decoder when one is available.
+
+    Returns:
+        cv2.VideoCapture: The video capture.
+    """
+    params = []
+    if decode_threads > 0:
+        params += [cv2.CAP_PROP_N_THREADS, decode_threads]
+    if hw_acceleration:
+        params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    return cv2.VideoCapture(video_path, cv2.CAP_ANY, params)
+
+
+def read_frames(cap, sample_stride=1, prefetch=16, frame_indices=None, start=0, end=None):
+    """
+    Decode the frames of an opened video on a background thread.
+
+    Frames are decoded ahead into a bounded queue so that decoding overlaps with the work done by the caller, while
+    keeping at most `prefetch` decoded frames in memory. Frames that are not sampled are skipped with `grab()`
+    without being retrieved. An error raised while decoding is raised again to the caller once the frames decoded
+    before it are consumed.
+
+    Parameters:
+        cap (cv2.VideoCapture): Opened video capture, positioned on the frame `start`.
+        sample_stride (int): Number of frames between two yielded frames (1 yields every frame).
+        prefetch (int): Maximum number of decoded frames waiting to be consumed.
+        frame_indices (set): If given, only the frames with these indices are yielded instead of one frame out of
+            every `sample_stride`, and the video is not read past the last of them.
+        start (int): Index of the frame the capture is positioned on.
+        end (int): Index of the frame where the reading stops, this frame excluded (None reads the video to its end).
+
+    Yields:
+        tuple: The index of the frame in the video and the frame (numpy.ndarray).
+    """
+    frame_queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    errors = []
+
+    def is_sampled(index):
+        if frame_indices is not None:
+            return index in frame_indices
+        return index % sample_stride == 0
+
+    stop_index = end if end is not None else float('inf')
+    if frame_indices is not None:
+        stop_index = min(stop_index, max(frame_indices, default=-1) + 1)
+
+    def reader():
+        try:
+            frame_index = start
+            while not stop.is_set() and frame_index < stop_index and cap.grab():
+                if is_sampled(frame_index):
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
+                    frame_queue.put((frame_index, frame))
+                frame_index += 1
+        except Exception as error:
+            errors.append(error)
+        finally:
+            # The end of the frames is always signaled, so that the consumer is never blocked
+            frame_queue.put(None)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        # Unblock the reader if the consumer stopped early, then wait for it to release the capture
+        stop.set()
+        while item is not None:
+            item = frame_queue.get()
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+@contextmanager
+def write_images(workers=4, queue_size=8):
+    """
+    Encode images to JPEG and write them to files on background threads.
+
+    The images are encoded and written by a pool of threads while the next frames are decoded and compared, keeping at
+    most `queue_size` images waiting in memory. OpenCV releases the GIL while encoding, so the threads encode several
+    images at the same time. All the images are written when the context exits.
+
+    Parameters:
+        workers (int): Number of threads encoding and writing the images.
+        queue_size (int): Maximum number of images waiting to be encoded.
+
+    Yields:
+        callable: Function queuing an image (numpy.ndarray) to be saved at the given path. The image must not be
+            modified afterwards.
+    """
+    image_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    def writer():
+        while True:
+            item = image_queue.get()
+            if item is None:
+                break
+            # After an error, the remaining images are only dequeued so that the caller is never blocked
+            if not errors:
+                output_path, image = item
+                try:
+                    ok, buffer = cv2.imencode('.jpg', image)
+                    if ok:
+                        buffer.tofile(output_path)
+                except (OSError, cv2.error) as error:
+                    errors.append(error)
+
+    def write_image(output_path, image):
+        image_queue.put((output_path, image))
+
+    threads = [threading.Thread(target=writer, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        yield write_image
+    finally:
+        for _ in threads:
+            image_queue.put(None)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+def compare_frames(video_path, start=0, end=None, sample_stride=1, downscale=1, threshold=-1, save_frame=None,
+                   decode_threads=0, hw_acceleration=False):
+    """
+    Calculate the Mean Squared Error between the frames of a range of a video and save frames that exceed the
+    threshold.
+
+    The range is read with its own capture, so that several ranges of the same video can be compared at the same time.
+    The sampled frame preceding the range is read too, only to be compared with the first frame of the range.
+
+    Parameters:
+        video_path (str): Path of the video.
+        start (int): Index of the first frame of the range, a multiple of `sample_stride`.
+        end (int): Index of the frame following the range (None compares the frames up to the end of the video).
+        sample_stride (int): Number of frames between two compared frames (1 compares every frame).
+        downscale (int): Factor by which the frames are downscaled before being compared (1 keeps the full
+            resolution).
+        threshold (float): Threshold for Mean Squared Error (-1 saves no frame).
+        save_frame (callable): Function called with the index and the frame of each frame exceeding the threshold.
+        decode_threads (int): Number of threads decoding the video (0 keeps the default of the backend).
+        hw_acceleration (bool): Whether to decode the video with a hardware decoder when one is available.
+
+    Returns:
+        tuple: The indices of the compared frames and their Mean Squared Error, as two numpy arrays.
+    """
+    mse_values = []
+    frame_indices = []
+    pp_prev_frame = None
+    gray_buffer = None
+    bin_buffer = None
+
+    first_index = max(start - sample_stride, 0)
+    cap = open_video(video_path, decode_threads, hw_acceleration)
+    if first_index > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_index)
+
+    for frame_index, frame in read_frames(cap, sample_stride, start=first_index, end=end):
+        if gray_buffer is None:
+            # The grayscale image is only an intermediate step, allocate it once for the whole range
+            gray_buffer = np.empty(crop_frame(frame).shape[:2], dtype=np.uint8)
+        pp_frame = preprocess_image(frame, gray_buffer, downscale, bin_buffer)
+        if pp_prev_frame is not None:
+            mse = calculate_mse(pp_prev_frame, pp_frame)
+            mse_values.append(mse)
+            frame_indices.append(frame_index)
+            if threshold != -1 and mse > threshold:
+                save_frame(frame_index, frame)
+
+        # The binarized frames alternate between two buffers, the next one overwrites the previous frame
+        bin_buffer = pp_prev_frame
+        pp_prev_frame = pp_frame
+
+    cap.release()
+    return np.array(frame_indices, dtype=np.int64), np.array(mse_values, dtype=np.float64)
+
+
+def process_video(video_path, output_folder, threshold=-1, duration=-1, sample_stride=1, downscale=1, segments=1,
+                  decode_threads=0, hw_acceleration=False):
     """
     Process a video by calculating the Mean Squared Error between frames and saving frames that exceed the threshold.
 
+    Only one frame out of every `sample_stride` is decoded and compared, the others are skipped with `grab()`
+    without being retrieved. Decoding runs on a background thread (see `read_frames`) while the frames are compared.
+
+    A long video can be split into `segments` consecutive ranges of frames, compared at the same time by a pool of
+    threads (see `compare_frames`), each range being seeked to once. The MSE of all the ranges are then gathered in
+    the order of the frames.
+
+    With a given threshold, frames are saved while they are compared. With the automatic threshold (the mean MSE),
+    which is only known once all the frames are compared, the video is read a second time sequentially, retrieving
+    only the frames to save. The frames are encoded to JPEG and written to files by a pool of background threads (see
+    `write_images`).
+
     Parameters:
         video_path (str): Path of the video to be processed.
         output_folder (str): Output folder path to save frames.
         threshold (float): Threshold for Mean Squared Error.
         duration (float): Real duration of the video in seconds.
+        sample_stride (int): Number of frames between two compared frames (1 compares every frame).
+        downscale (int): Factor by which the frames are downscaled before being compared (1 keeps the full
+            resolution).
+        segments (int): Number of ranges of frames compared in parallel (1 reads the video from start to end).
+        decode_threads (int): Number of threads decoding each range of the video (0 keeps the default of the backend).
+        hw_acceleration (bool): Whether to decode the video with a hardware decoder when one is available.
     """
-    cap = cv2.VideoCapture(video_path)
+    cap = open_video(video_path, decode_threads, hw_acceleration)
     if not cap.isOpened():
         print(f"Unable to open the video: {video_path}")
         return
-
-    mse_values = []
-    _, prev_frame = cap.read()
-    pp_prev_frame = preprocess_image(prev_frame)
-    frame_count = 0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
 
     video_name = os.path.splitext(os.path.basename(video_path))[0]
 
+    # Everything but the frame-dependent end of the output paths is computed once per video
     if duration > 0:
-        interval = int(duration / (int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) + 1))
-
-        box_cam_name = '_'.join(video_name.split('_')[:2])
-        date_and_time = datetime.strptime('_'.join(video_name.split('_')[2:]), "%Y-%m-%d_%H-%M-%S")
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        pp_frame = preprocess_image(frame)
-        mse = calculate_mse(pp_prev_frame, pp_frame)
-        mse_values.append(mse)
-
-        pp_prev_frame = pp_frame.copy()
-        frame_count += 1
-
-    if threshold == -1:
-        threshold = sum(mse_values) / len(mse_values)
-
-    for i, mse_value in enumerate(mse_values):
-        if mse_value > threshold:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i + 1)
-            _, frame = cap.read()
-            if duration > 0:
-                time_change = timedelta(seconds=(i + 1) * interval)
-                new_date_and_time = date_and_time + time_change
-                output_path = os.path.join(output_folder, box_cam_name + '_' + new_date_and_time.strftime("%Y-%m-%d_%H-%M-%S") + '.jpg')
-            else:
-                output_path = os.path.join(output_folder, f'{video_name}_{i + 1}.jpg')
-            cv2.imwrite(output_path, frame)
-
-    cap.release()
-
+        interval = timedelta(seconds=int(duration / (frame_count + 1)))
 
-def process_videos_in_folder(folder_path, output_folder, threshold, duration):
+        name_parts = video_name.split('_')
+        box_cam_name = '_'.join(name_parts[:2])
+        year, month, day, hour, minute, second = map(int, re.split('[-_]', '_'.join(name_parts[2:])))
+        date_and_time = datetime(year, month, day, hour, minute, second)
+        output_prefix = os.path.join(output_folder, box_cam_name + '_')
+    else:
+        output_prefix = os.path.join(output_folder, video_name + '_')
+
+    def save_frame(frame_index, frame):
+        if duration > 0:
+            date = date_and_time + frame_index * interval
+            output_path = (f'{output_prefix}{date.year:04d}-{date.month:02d}-{date.day:02d}_'
+                           f'{date.hour:02d}-{date.minute:02d}-{date.second:02d}.jpg')
+        else:
+            output_path = f'{output_prefix}{frame_index}.jpg'
+        write_image(output_path, frame)
+
+    with write_images() as write_image:
+        compare = partial(compare_frames, video_path, sample_stride=sample_stride, downscale=downscale,
+                          threshold=threshold, save_frame=save_frame, decode_threads=decode_threads,
+                          hw_acceleration=hw_acceleration)
+
+        # Each range holds a whole number of strides, the last one is read up to the end of the video whatever the
+        # (possibly inaccurate) number of frames reported by the container
+        segments = max(1, min(segments, frame_count // sample_stride))
+        if segments == 1:
+            results = [compare(0, None)]
+        else:
+            length = -(-frame_count // (segments * sample_stride)) * sample_stride
+            starts = [i * length for i in range(segments)]
+            with ThreadPoolExecutor(max_workers=segments) as executor:
+                results = list(executor.map(compare, starts, starts[1:] + [None]))
+
+        frame_indices = np.concatenate([indices for indices, _ in results])
+        mse_values = np.concatenate([values for _, values in results])
+
+        if threshold == -1 and mse_values.size:
+            threshold = mse_values.mean()
+            selected_indices = set(frame_indices[mse_values > threshold].tolist())
+
+            if selected_indices:
+                cap = open_video(video_path, decode_threads, hw_acceleration)
+                for frame_index, frame in read_frames(cap, frame_indices=selected_indices):
+                    save_frame(frame_index, frame)
+                cap.release()
+
+
+def process_videos_in_folder(folder_path, output_folder, threshold, duration, sample_stride=1, workers=None,
+                             downscale=1, segments=1, decode_threads=None, hw_acceleration=False):
     """
-    Process all videos in a folder using the 'process_video' function.
+    Process all videos in a folder in parallel using the 'process_video' function.
+
+    Each video is independent, so they are distributed over a pool of processes, with no more processes than videos.
+    Each process limits OpenCV to a single thread, the parallelism coming from the pool. By default the CPUs are shared
+    between the decoders of the videos (and of their ranges) processed at the same time, so that a folder with fewer
+    videos than CPUs still uses all of them.
 
     Parameters:
         folder_path (str): Path of the folder containing the videos.
         output_folder (str): Output folder path to save frames.
         threshold (float): Threshold for Mean Squared Error.
         duration (float): Real duration of the videos in seconds.
+        sample_stride (int): Number of frames between two compared frames (1 compares every frame).
+        workers (int): Number of videos processed at the same time (None uses one process per CPU, at most one per
+            video). When a single video is processed at a time, the videos are processed sequentially in the current
+            process.
+        downscale (int): Factor by which the frames are downscaled before being compared (1 keeps the full
+            resolution).
+        segments (int): Number of ranges of frames of each video compared in parallel (1 reads each video from start to
+            end).
+        decode_threads (int): Number of threads decoding each video or range of video (None shares the CPUs between
+            the videos and ranges decoded at the same time, 0 keeps the default of the backend).
+        hw_acceleration (bool): Whether to decode the videos with a hardware decoder when one is available.
+
+    Raises:
+        ValueError: If `sample_stride` or `workers` is lower than 1.
     """
+    if sample_stride < 1:
+        raise ValueError(f"The sample stride must be at least 1, got {sample_stride}.")
+    if workers is not None and workers < 1:
+        raise ValueError(f"The number of workers must be at least 1, got {workers}.")
+    segments = max(1, segments)
+
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    video_files = [f for f in os.listdir(folder_path) if f.endswith(('.mp4', '.avi'))]
+    with os.scandir(folder_path) as entries:
+        video_paths = [entry.path for entry in entries
+                       if entry.is_file() and os.path.splitext(entry.name)[1][1:].lower() in VIDEO_EXTENSIONS]
+
+    cpu_count = os.cpu_count() or 1
+    videos_at_once = max(1, min(workers or cpu_count, len(video_paths)))
+    if decode_threads is None:
+        decode_threads = max(1, cpu_count // (videos_at_once * segments))
 
-    for video_file in tqdm(video_files, desc="Extract frames", unit="video"):
-        video_path = os.path.join(folder_path, video_file)
-        process_video(video_path, output_folder, threshold, duration)
+    process = partial(process_video, output_folder=output_folder, threshold=threshold, duration=duration,
+                      sample_stride=sample_stride, downscale=downscale, segments=segments,
+                      decode_threads=decode_threads, hw_acceleration=hw_acceleration)
+
+    if videos_at_once == 1:
+        for video_path in tqdm(video_paths, desc="Extract frames", unit="video"):
+            process(video_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=videos_at_once, initializer=cv2.setNumThreads, initargs=(1,)) as executor:
+        futures = [executor.submit(process, video_path) for video_path in video_paths]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Extract frames", unit="video"):
+            future.result()
 
 
 def main():
@@ -167,6 +506,12 @@ def main():
     parser.add_argument("-d", "--destination-folder-path", default=None, help="Output folder path to save frames.")
     parser.add_argument("-t", "--threshold", type=float, default=-1., help="Threshold for Mean Squared Error.")
     parser.add_argument("-D", "--duration", type=float, default=-1., help="Real duration of the videos in seconds.")
+    parser.add_argument("-S", "--sample-stride", type=int, default=1, help="Compare only one frame out of every N frames.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of videos processed in parallel.")
+    parser.add_argument("-F", "--downscale-factor", type=int, default=1, help="Factor by which the frames are downscaled before being compared.")
+    parser.add_argument("-g", "--segments", type=int, default=1, help="Number of ranges of frames of each video compared in parallel.")
+    parser.add_argument("-T", "--decode-threads", type=int, default=None, help="Number of threads decoding each video.")
+    parser.add_argument("-a", "--hw-acceleration", default=False, action=argparse.BooleanOptionalAction, help="Decode the videos with a hardware decoder when one is available.")
     args = parser.parse_args()
 
     # Check if the original-folder-path option is empty
@@ -181,8 +526,15 @@ def main():
         destination_folder_path = os.path.join(os.path.dirname(original_folder_path), 'frames')
     threshold = args.threshold
     duration = args.duration
-
-    process_videos_in_folder(original_folder_path, destination_folder_path, threshold, duration)
+    sample_stride = args.sample_stride
+    workers = args.workers
+    downscale = args.downscale_factor
+    segments = args.segments
+    decode_threads = args.decode_threads
+    hw_acceleration = args.hw_acceleration
+
+    process_videos_in_folder(original_folder_path, destination_folder_path, threshold, duration, sample_stride, workers,
+                             downscale, segments, decode_threads, hw_acceleration)
 
 
 if __name__ == "__main__":
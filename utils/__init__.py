@@ -1,3 +1,6 @@
 from .VideoFrameExtractor import process_videos_in_folder
-from .ImageOrganizerUtility import get_all_images, sort_images_rec, create_images_sorted_folders
+from .ImageOrganizerUtility import (
+    check_sort_modes, create_images_sorted_folders, get_all_images, iter_sorted_images,
+    parse_sort_modes, sort_images_rec, transfer_images
+)
 from .ImageEqualizer import create_folders
\ No newline at end of file